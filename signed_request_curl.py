@@ -2,128 +2,387 @@ import os
 import time
 import hmac
 import hashlib
-from urllib.parse import urlencode
+import logging
+import re
+import ssl
+import threading
+from urllib.parse import quote_plus
 from dotenv import load_dotenv
-import subprocess
 import json
-import platform
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.util.retry import Retry
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+_needs_quoting = re.compile(r'[^A-Za-z0-9_.~-]').search
+
+def _qs(items):
+    # Same output as urlencode, but symbols, enums and numbers skip quote_plus entirely
+    parts = []
+    for key, value in items:
+        value = str(value)
+        parts.append(f"{key}={quote_plus(value) if _needs_quoting(value) else value}")
+    return '&'.join(parts)
+
+# Digest name for the HMAC template. hmac builds the same OpenSSL-backed _hashlib.HMAC for
+# 'sha256' as for hashlib.sha256, so this is only a naming tidy-up, not a faster path
+HMAC_DIGEST = 'sha256'
+logger.debug("HMAC-SHA256 backend: %s (%s)", hashlib.sha256.__module__, ssl.OPENSSL_VERSION)
+
+TRANSPORT_ERRORS = (requests.RequestException, httpx.HTTPError) if httpx else (requests.RequestException,)
+STREAM_ERRORS = (Urllib3HTTPError, ijson.JSONError) if ijson else (Urllib3HTTPError,)
+
+class ResponseCache:
+    # Short-lived memo for repeated public reads. Keys are plain param tuples: Python's
+    # built-in tuple hash is far cheaper than any digest, and nothing here needs to be
+    # cryptographic (request signing always stays HMAC-SHA256). Disabled while ttl is 0.
+    __slots__ = ('ttl', 'maxsize', '_entries', '_lock')
+
+    def __init__(self, ttl=0, maxsize=256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = {}
+        # Shared by every trader and used from pooled worker threads
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def put(self, key, value):
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.maxsize:
+                # Dicts keep insertion order, so this evicts the oldest entry
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def _make_requests_session(api_key=None):
+    # One persistent session so TCP/TLS connections are reused across calls
+    session = requests.Session()
+    if api_key is not None:
+        session.headers['X-MBX-APIKEY'] = api_key
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=64,
+        # raise_on_status=False hands back the last 5xx reply so its error JSON is still returned
+        max_retries=Retry(total=3, backoff_factor=0.1, status_forcelist=(502, 503, 504), raise_on_status=False)
+    )
+    session.mount('https://', adapter)
+    return session
+
 class AsterdexTrader:
     BASE_URL = "https://fapi.asterdex.com"
-    CURL_BINARY = "curl.exe" if platform.system() == "Windows" else "curl"
+    # Full endpoint URLs, joined once at class creation rather than per call
+    ORDER_URL = BASE_URL + "/fapi/v1/order"
+    POSITION_RISK_URL = BASE_URL + "/fapi/v2/positionRisk"
+    LEVERAGE_URL = BASE_URL + "/fapi/v1/leverage"
+    ACCOUNT_URL = BASE_URL + "/fapi/v2/account"
+    KLINES_URL = BASE_URL + "/fapi/v1/klines"
+
+    # Unsigned public reads (klines) share one pooled session across all traders
+    public_session = _make_requests_session()
 
-    def __init__(self, api_key, secret_key):
+    __slots__ = ('api_key', 'secret_key', '_secret_bytes', '_hmac_template', 'session', '_body_arg')
+
+    def __init__(self, api_key, secret_key, http2=False):
         self.api_key = api_key
         self.secret_key = secret_key
+        self._secret_bytes = secret_key.encode('utf-8') if secret_key else None
+        # Key pads are absorbed once here; each signature just copies this state
+        self._hmac_template = hmac.new(self._secret_bytes, b'', HMAC_DIGEST) if secret_key else None
+        self.session = self._make_session(api_key, http2)
+        # httpx takes a pre-encoded body as content=, requests as data=
+        self._body_arg = 'data' if isinstance(self.session, requests.Session) else 'content'
+
+    def _make_session(self, api_key, http2):
+        if http2 and httpx is not None:
+            session = self._make_httpx_session(httpx.Client, httpx.HTTPTransport, api_key)
+            if session is not None:
+                return session
 
-    def _get_signature(self, params):
-        payload_string = urlencode(sorted(params.items()))
-        return hmac.new(
-            self.secret_key.encode('utf-8'),
-            payload_string.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
+        return _make_requests_session(api_key)
 
-    def _execute_curl(self, curl_command):
+    @staticmethod
+    def _make_httpx_session(client_cls, transport_cls, api_key, http2=True):
+        # HTTP/2 multiplexes concurrent calls over a single TLS connection; needs httpx[http2].
+        # httpx only retries failed connects; unlike the requests adapter it does not retry 502/503/504.
+        # Keyless traders (e.g. a missing .env) can still read public endpoints
+        headers = {'X-MBX-APIKEY': api_key} if api_key is not None else None
+        try:
+            transport = transport_cls(
+                http2=http2,
+                retries=3,
+                limits=httpx.Limits(max_keepalive_connections=8, max_connections=32)
+            )
+        except ImportError:
+            return None
+        return client_cls(headers=headers, transport=transport)
+
+    def _get_signature(self, payload_string):
+        h = self._hmac_template.copy()
+        # The query string is always percent-quoted ASCII
+        h.update(payload_string.encode('ascii'))
+        return h.hexdigest()
+
+    def signBatch(self, payloads):
+        # Signs many query strings (str or bytes) with the prepared HMAC state, skipping per-call setup
+        copy = self._hmac_template.copy
+        signatures = []
+        for payload in payloads:
+            h = copy()
+            h.update(payload if isinstance(payload, bytes) else payload.encode('ascii'))
+            signatures.append(h.hexdigest())
+        return signatures
+
+    @staticmethod
+    def _handle_response(send, *args, **kwargs):
         try:
-            result = subprocess.check_output(curl_command, shell=True, stderr=subprocess.PIPE)
-            return json.loads(result)
-        except subprocess.CalledProcessError as e:
-            print(f"Error executing curl command: {e}")
-            print(f"Stderr: {e.stderr.decode()}")
+            response = send(*args, **kwargs)
+        except TRANSPORT_ERRORS as e:
+            print(f"Error executing request: {e}")
             return None
+        return AsterdexTrader._parse_json(response.content)
+
+    @staticmethod
+    def _handle_stream_response(url):
+        try:
+            response = AsterdexTrader.public_session.get(url, stream=True, timeout=10)
+        except TRANSPORT_ERRORS as e:
+            print(f"Error executing request: {e}")
+            return None
+        try:
+            response.raw.decode_content = True
+            if ijson is None or not response.ok:
+                return AsterdexTrader._parse_json(response.raw.read())
+            # Rows are parsed straight off the socket, so the full body is never held in memory
+            return list(ijson.items(response.raw, 'item', use_float=True))
+        except STREAM_ERRORS as e:
+            print(f"Error reading streamed response: {e}")
+            return None
+        finally:
+            response.close()
+
+    @staticmethod
+    def _parse_json(content):
+        try:
+            # Parse the raw bytes; .json() would decode to str first
+            return json_loads(content)
         except json.JSONDecodeError as e:
             print(f"Error decoding JSON from response: {e}")
             return None
 
-    def placeTrade(self, symbol, side, order_type, quantity):
-        ENDPOINT = "/fapi/v1/order"
-        full_url = self.BASE_URL + ENDPOINT
-
-        params_to_sign = {
-            'symbol': symbol,
-            'side': side,
-            'type': order_type,
-            'quantity': quantity,
-            'timestamp': int(time.time() * 1000)
-        }
-
-        signature = self._get_signature(params_to_sign)
-        final_request_body = f"{urlencode(sorted(params_to_sign.items()))}&signature={signature}"
-        
-        curl_command = f'''{self.CURL_BINARY} -s -H "X-MBX-APIKEY: {self.api_key}" -X POST "{full_url}" -d "{final_request_body}"'''
-        return self._execute_curl(curl_command)
+    def _send(self, method, url, body=None):
+        if body is None:
+            return self._handle_response(self.session.request, method, url, timeout=10)
+        return self._handle_response(
+            self.session.request, method, url, headers=FORM_HEADERS, timeout=10, **{self._body_arg: body}
+        )
 
-    def getPositionRisk(self):
-        ENDPOINT = "/fapi/v2/positionRisk"
-        full_url = self.BASE_URL + ENDPOINT
+    def _sign_query(self, static_params):
+        # The exact signed string goes on the wire, so nothing is re-encoded on send
+        timestamp = f"timestamp={time.time_ns() // 1_000_000}"
+        query_string = f"{_qs(static_params)}&{timestamp}" if static_params else timestamp
+        return f"{query_string}&signature={self._get_signature(query_string)}"
 
-        params_to_sign = {
-            'timestamp': int(time.time() * 1000)
-        }
+    def _signed_get(self, full_url, static_params=()):
+        return self._send("GET", f"{full_url}?{self._sign_query(static_params)}")
 
-        signature = self._get_signature(params_to_sign)
-        final_request_url = f"{full_url}?{urlencode(sorted(params_to_sign.items()))}&signature={signature}"
+    def _signed_post(self, full_url, static_params=()):
+        return self._send("POST", full_url, self._sign_query(static_params))
 
-        curl_command = f'''{self.CURL_BINARY} -s -H "X-MBX-APIKEY: {self.api_key}" -X GET "{final_request_url}"'''
-        return self._execute_curl(curl_command)
+    def placeTrade(self, symbol, side, order_type, quantity):
+        params_to_sign = (
+            ('symbol', symbol),
+            ('side', side),
+            ('type', order_type),
+            ('quantity', quantity)
+        )
 
-    def setLeverage(self, symbol, leverage):
-        ENDPOINT = "/fapi/v1/leverage"
-        full_url = self.BASE_URL + ENDPOINT
+        return self._signed_post(self.ORDER_URL, params_to_sign)
 
-        params_to_sign = {
-            'symbol': symbol,
-            'leverage': leverage,
-            'timestamp': int(time.time() * 1000)
-        }
+    def getPositionRisk(self):
+        return self._signed_get(self.POSITION_RISK_URL)
 
-        signature = self._get_signature(params_to_sign)
-        final_request_body = f"{urlencode(sorted(params_to_sign.items()))}&signature={signature}"
+    def setLeverage(self, symbol, leverage):
+        params_to_sign = (
+            ('symbol', symbol),
+            ('leverage', leverage)
+        )
 
-        curl_command = f'''{self.CURL_BINARY} -s -H "X-MBX-APIKEY: {self.api_key}" -X POST "{full_url}" -d "{final_request_body}"'''
-        return self._execute_curl(curl_command)
+        return self._signed_post(self.LEVERAGE_URL, params_to_sign)
 
     def getAccountInfo(self):
-        ENDPOINT = "/fapi/v2/account"
-        full_url = self.BASE_URL + ENDPOINT
+        return self._signed_get(self.ACCOUNT_URL)
 
-        params_to_sign = {
-            'timestamp': int(time.time() * 1000)
-        }
+    @staticmethod
+    def _klines_url(symbol, interval, limit):
+        params = (
+            ('symbol', symbol),
+            ('interval', interval),
+            ('limit', limit)
+        )
 
-        signature = self._get_signature(params_to_sign)
-        final_request_url = f"{full_url}?{urlencode(sorted(params_to_sign.items()))}&signature={signature}"
+        return f"{AsterdexTrader.KLINES_URL}?{_qs(params)}"
 
-        curl_command = f'''{self.CURL_BINARY} -s -H "X-MBX-APIKEY: {self.api_key}" -X GET "{final_request_url}"'''
-        return self._execute_curl(curl_command)
+    # Shared by all traders; set klines_cache.ttl (seconds) to reuse identical kline reads
+    klines_cache = ResponseCache()
 
     @staticmethod
-    def getKlines(symbol, interval, limit=500):
-        ENDPOINT = "/fapi/v1/klines"
-        
-        params = {
-            'symbol': symbol,
-            'interval': interval,
-            'limit': limit
-        }
-        
-        query_string = urlencode(params)
-        full_url = f"{AsterdexTrader.BASE_URL}{ENDPOINT}?{query_string}"
-        
-        curl_command = f'''{AsterdexTrader.CURL_BINARY} -s -X GET "{full_url}"'''
+    def getKlines(symbol, interval, limit=500, stream=False):
+        cache_key = (symbol, interval, limit)
+        klines = AsterdexTrader.klines_cache.get(cache_key)
+        if klines is None:
+            full_url = AsterdexTrader._klines_url(symbol, interval, limit)
+            if stream:
+                klines = AsterdexTrader._handle_stream_response(full_url)
+            else:
+                klines = AsterdexTrader._handle_response(AsterdexTrader.public_session.get, full_url, timeout=10)
+            # Error payloads come back as dicts and should not be memoized
+            if isinstance(klines, list):
+                AsterdexTrader.klines_cache.put(cache_key, klines)
+        return klines
+
+    # Column order of the array returned by getKlinesArray
+    KLINE_COLUMNS = ('open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time')
+
+    @staticmethod
+    def getKlinesArray(symbol, interval, limit=500, stream=False):
+        # Check before fetching so a missing numpy doesn't cost a round trip
+        if np is None:
+            raise ImportError("getKlinesArray requires numpy (pip install numpy)")
+        return AsterdexTrader._klines_to_array(AsterdexTrader.getKlines(symbol, interval, limit, stream))
+
+    @staticmethod
+    def _klines_to_array(klines):
+        if not isinstance(klines, list):
+            if klines is not None:
+                print(f"Unexpected klines response: {klines}")
+            return None
+        if not klines:
+            return np.empty((0, len(AsterdexTrader.KLINE_COLUMNS)))
+
+        # One conversion to a contiguous float64 block instead of per-row Python work downstream
+        return np.asarray(klines, dtype=object)[:, :len(AsterdexTrader.KLINE_COLUMNS)].astype(np.float64)
+
+
+class _AsyncChunkReader:
+    # Minimal async file-like view over httpx's byte iterator, as ijson.items_async expects
+    __slots__ = ('_chunks',)
+
+    def __init__(self, chunks):
+        self._chunks = chunks.__aiter__()
+
+    async def read(self, size=-1):
+        # ijson probes with read(0) to detect bytes vs str; that must not consume a chunk
+        if size == 0:
+            return b''
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b''
+
+
+class AsyncAsterdexTrader(AsterdexTrader):
+    # Every endpoint funnels into _send, so the inherited signed methods return
+    # coroutines here and independent calls can be overlapped with asyncio.gather
+
+    __slots__ = ()
+
+    def __init__(self, api_key, secret_key, http2=True):
+        super().__init__(api_key, secret_key, http2)
+
+    def _make_session(self, api_key, http2):
+        if httpx is None:
+            raise ImportError("AsyncAsterdexTrader requires httpx (pip install httpx)")
+        session = self._make_httpx_session(httpx.AsyncClient, httpx.AsyncHTTPTransport, api_key, http2) if http2 else None
+        # Without the h2 package this is still a pooled keep-alive HTTP/1.1 client
+        return session or self._make_httpx_session(httpx.AsyncClient, httpx.AsyncHTTPTransport, api_key, http2=False)
+
+    async def _send(self, method, url, body=None):
         try:
-            result = subprocess.check_output(curl_command, shell=True, stderr=subprocess.PIPE)
-            return json.loads(result)
-        except subprocess.CalledProcessError as e:
-            print(f"Error executing curl command: {e}")
-            print(f"Stderr: {e.stderr.decode()}")
+            if body is None:
+                response = await self.session.request(method, url, timeout=10)
+            else:
+                response = await self.session.request(method, url, headers=FORM_HEADERS, content=body, timeout=10)
+        except httpx.HTTPError as e:
+            print(f"Error executing request: {e}")
             return None
-        except json.JSONDecodeError as e:
-            print(f"Error decoding JSON from response: {e}")
+        return self._parse_json(response.content)
+
+    async def _send_stream(self, url):
+        try:
+            async with self.session.stream("GET", url, timeout=10) as response:
+                if ijson is None or not response.is_success:
+                    return self._parse_json(await response.aread())
+                # Rows are parsed as chunks arrive, so the full body is never held in memory
+                reader = _AsyncChunkReader(response.aiter_bytes())
+                return [row async for row in ijson.items_async(reader, 'item', use_float=True)]
+        except httpx.HTTPError as e:
+            print(f"Error executing request: {e}")
             return None
+        except STREAM_ERRORS as e:
+            print(f"Error reading streamed response: {e}")
+            return None
+
+    async def getKlines(self, symbol, interval, limit=500, stream=False):
+        cache_key = (symbol, interval, limit)
+        klines = self.klines_cache.get(cache_key)
+        if klines is None:
+            full_url = self._klines_url(symbol, interval, limit)
+            if stream:
+                klines = await self._send_stream(full_url)
+            else:
+                klines = await self._send("GET", full_url)
+            if isinstance(klines, list):
+                self.klines_cache.put(cache_key, klines)
+        return klines
+
+    async def getKlinesArray(self, symbol, interval, limit=500, stream=False):
+        if np is None:
+            raise ImportError("getKlinesArray requires numpy (pip install numpy)")
+        return self._klines_to_array(await self.getKlines(symbol, interval, limit, stream))
+
+    async def aclose(self):
+        await self.session.aclose()
 
 '''
 if __name__ == "__main__":